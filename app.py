@@ -1,5 +1,6 @@
 # app.py
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, abort, url_for
+from markupsafe import Markup
 import pickle
 import pandas as pd
 from utils.feature_extractor import extract_enhanced_features, extract_basic_features
@@ -8,11 +9,19 @@ from urllib.parse import urlparse
 import time
 import numpy as np
 from sklearn.metrics import precision_score, recall_score, f1_score, confusion_matrix
-import base64
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import io
+import gzip
+import hashlib
+import threading
+from functools import lru_cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 
@@ -30,6 +39,15 @@ except Exception as e:
     print(f"❌ Error loading model: {e}")
     model = None
 
+# Static metric assets (e.g. the confusion matrix PNG), keyed by content-hashed filename
+metric_assets = {}
+_metrics_cache = None
+_metrics_lock = threading.Lock()
+
+ASSET_MAX_AGE = 365 * 24 * 3600
+COMPRESSIBLE_MIMETYPES = {'text/html', 'text/plain', 'text/css', 'application/json', 'application/javascript'}
+COMPRESS_MIN_SIZE = 500
+
 # Load test data for metrics (you'll need to store this during training)
 def load_test_data():
     """Load test data for calculating metrics"""
@@ -45,7 +63,7 @@ def load_test_data():
 def calculate_model_metrics():
     """Calculate comprehensive model metrics"""
     test_data = load_test_data()
-    if test_data is None:
+    if test_data is None or model is None:
         return None
     
     X_test, y_test = test_data['X_test'], test_data['y_test']
@@ -85,13 +103,12 @@ def calculate_model_metrics():
                    ha="center", va="center",
                    color="white" if cm[i, j] > thresh else "black")
     
-    # Save plot to base64 string
+    # Save plot as a content-hashed asset served by /assets/
     buf = io.BytesIO()
     plt.tight_layout()
     plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-    buf.seek(0)
-    confusion_matrix_img = base64.b64encode(buf.getvalue()).decode('utf-8')
     plt.close()
+    confusion_matrix_file = register_metric_asset('confusion_matrix', 'png', buf.getvalue(), 'image/png')
     
     return {
         'accuracy': accuracy,
@@ -99,10 +116,32 @@ def calculate_model_metrics():
         'recall': recall,
         'f1_score': f1,
         'confusion_matrix': cm.tolist(),
-        'confusion_matrix_img': confusion_matrix_img,
+        'confusion_matrix_file': confusion_matrix_file,
         'support': len(y_test)
     }
 
+def register_metric_asset(name, extension, data, mimetype):
+    """Store a generated asset under a content-hashed filename and return that filename"""
+    digest = hashlib.sha256(data).hexdigest()
+    filename = f"{name}.{digest[:12]}.{extension}"
+    metric_assets[filename] = (data, mimetype, digest)
+    return filename
+
+def get_model_metrics():
+    """Return model metrics, calculating them only once per process"""
+    global _metrics_cache
+    if _metrics_cache is None:
+        # pyplot keeps global figure state, so only one thread may build the metrics
+        with _metrics_lock:
+            if _metrics_cache is None:
+                _metrics_cache = calculate_model_metrics()
+    return _metrics_cache
+
+@lru_cache(maxsize=8)
+def render_verdict_fragment(result):
+    """Render the verdict badge and title; there are only a handful of distinct verdicts"""
+    return Markup(render_template('partials/verdict.html', result=result))
+
 def analyze_network_indicators(features):
     """Analyze network features for additional insights"""
     indicators = []
@@ -145,21 +184,67 @@ def analyze_network_indicators(features):
     
     return indicators
 
+@app.after_request
+def compress_response(response):
+    """Compress text responses with brotli or gzip, depending on what the client accepts"""
+    if (response.direct_passthrough
+            or response.is_streamed
+            or not 200 <= response.status_code < 300
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    accept_encodings = request.accept_encodings
+    if brotli is not None and accept_encodings['br'] > 0:
+        encoding, data = 'br', brotli.compress(data, quality=5)
+    elif accept_encodings['gzip'] > 0:
+        encoding, data = 'gzip', gzip.compress(data, compresslevel=6)
+    else:
+        return response
+
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
 @app.route('/')
 def home():
     # Calculate metrics for homepage
-    metrics = calculate_model_metrics()
+    metrics = get_model_metrics()
     return render_template('index.html', metrics=metrics)
 
 @app.route('/metrics')
 def metrics_api():
     """API endpoint for model metrics"""
-    metrics = calculate_model_metrics()
+    metrics = get_model_metrics()
     if metrics:
+        metrics = dict(metrics)
+        confusion_matrix_file = metrics.pop('confusion_matrix_file')
+        metrics['confusion_matrix_url'] = url_for('metric_asset', filename=confusion_matrix_file)
         return jsonify(metrics)
     else:
         return jsonify({'error': 'Metrics not available'})
 
+@app.route('/assets/<path:filename>')
+def metric_asset(filename):
+    """Serve content-hashed metric assets with long-lived cache headers"""
+    get_model_metrics()
+    asset = metric_assets.get(filename)
+    if asset is None:
+        abort(404)
+
+    data, mimetype, digest = asset
+    response = Response(data, mimetype=mimetype)
+    response.set_etag(digest)
+    response.cache_control.public = True
+    response.cache_control.max_age = ASSET_MAX_AGE
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
+
 @app.route('/predict', methods=['POST'])
 def predict():
     if request.method == 'POST':
@@ -215,18 +300,15 @@ def predict():
             
             processing_time = time.time() - start_time
             
-            # Get metrics for the result page
-            metrics = calculate_model_metrics()
-            
             return render_template('network_result.html', 
                                  url=url, 
                                  result=result,
+                                 verdict_html=render_verdict_fragment(result),
                                  confidence=f"{confidence:.2%}",
                                  processing_time=f"{processing_time:.2f}s",
                                  network_indicators=network_indicators,
                                  features_used=features_used,
                                  total_features_analyzed=total_features_analyzed,
-                                 metrics=metrics,
                                  error=False)
             
         except Exception as e:
@@ -0,0 +1,8 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# app.py loads the model with paths relative to the repository root
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
@@ -0,0 +1,98 @@
+import base64
+import gzip
+import time
+
+import pytest
+
+import app as phish_app
+
+
+@pytest.fixture
+def client():
+    phish_app.app.config['TESTING'] = True
+    return phish_app.app.test_client()
+
+
+@pytest.fixture
+def asset_url(client):
+    return client.get('/metrics').get_json()['confusion_matrix_url']
+
+
+def test_metrics_calculated_outside_request_context():
+    metrics = phish_app.calculate_model_metrics()
+    assert metrics['confusion_matrix_file'] in phish_app.metric_assets
+
+
+def test_metrics_api_returns_asset_url_instead_of_inline_image(client):
+    data = client.get('/metrics').get_json()
+    assert 'confusion_matrix_img' not in data
+    assert 'confusion_matrix_file' not in data
+    assert data['confusion_matrix_url'].startswith('/assets/confusion_matrix.')
+    assert data['confusion_matrix_url'].endswith('.png')
+
+
+def test_asset_is_served_with_immutable_cache_headers(client, asset_url):
+    response = client.get(asset_url)
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert response.headers['ETag']
+    cache_control = response.cache_control
+    assert cache_control.public
+    assert cache_control.immutable
+    assert cache_control.max_age == phish_app.ASSET_MAX_AGE
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_asset_returns_not_modified_for_matching_etag(client, asset_url):
+    etag = client.get(asset_url).headers['ETag']
+    response = client.get(asset_url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_unknown_asset_returns_not_found(client):
+    assert client.get('/assets/confusion_matrix.000000000000.png').status_code == 404
+
+
+def test_brotli_preferred_when_accepted(client):
+    if phish_app.brotli is None:
+        pytest.skip('brotli is not installed')
+    response = client.get('/', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert 'Accept-Encoding' in response.vary
+    assert b'PhishGuard' in phish_app.brotli.decompress(response.data)
+
+
+def test_gzip_used_when_brotli_unavailable(client, monkeypatch):
+    monkeypatch.setattr(phish_app, 'brotli', None)
+    response = client.get('/', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert b'PhishGuard' in gzip.decompress(response.data)
+
+
+def test_uncompressed_without_accept_encoding(client):
+    response = client.get('/', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.vary
+    assert b'PhishGuard' in response.data
+
+
+def test_metrics_response_an_order_of_magnitude_smaller(client, asset_url):
+    # Before, /metrics inlined the confusion matrix as base64
+    inline_size = len(base64.b64encode(client.get(asset_url).data))
+    assert len(client.get('/metrics').data) * 10 <= inline_size
+
+
+def test_cached_metrics_an_order_of_magnitude_faster():
+    phish_app.get_model_metrics()
+
+    start = time.perf_counter()
+    phish_app.calculate_model_metrics()
+    uncached = time.perf_counter() - start
+
+    start = time.perf_counter()
+    phish_app.get_model_metrics()
+    cached = time.perf_counter() - start
+
+    assert cached * 10 <= uncached